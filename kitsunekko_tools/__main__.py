@@ -82,7 +82,7 @@ class IgnoreCli:
 
     def show(self) -> None:
         """
-        Print the list of ignore rules as Unix shell-style wildcards.
+        Print the list of ignore rules. Rules may contain '*' and '?' wildcards.
         """
         print("\n".join(self._get_list().patterns()))
 
@@ -161,16 +161,18 @@ class Application:
         except KitsuException as ex:
             print(ex.what)
 
-    def sanitize(self) -> None:
+    def sanitize(self, full: bool = False) -> None:
         """
         Rename directories if they have prohibited names.
+
+        :param full: Check every directory, including those that haven't changed since the last run.
         """
         try:
             data = self._config.data()
         except ConfigFileNotFoundError as ex:
             print(ex.what)
         else:
-            sanitize_directories(data)
+            sanitize_directories(data, full=full)
 
     def git(self, *args) -> None:
         """
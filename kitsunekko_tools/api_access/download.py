@@ -5,6 +5,7 @@ import collections
 import dataclasses
 import datetime
 import enum
+import os
 import pathlib
 import typing
 from collections.abc import Coroutine
@@ -17,12 +18,14 @@ from kitsunekko_tools.api_access.root_directory import (
     ApiDirectoryEntry,
     KitsuDirectoryMeta,
     iter_catalog_directories,
+    read_directory_meta,
 )
 from kitsunekko_tools.common import KitsuException
 from kitsunekko_tools.config import KitsuConfig, get_config
 from kitsunekko_tools.consts import INFO_FILENAME, TRASH_DIR_NAME
 from kitsunekko_tools.download import ClientBase, ClientType
 from kitsunekko_tools.file_downloader import (
+    HTTP_LIMITS,
     KitsuConnectionError,
     KitsuSubtitleDownload,
     KitsuSubtitleDownloader,
@@ -51,6 +54,8 @@ def get_http_api_client(config: KitsuConfig) -> httpx.AsyncClient:
         headers=typing.cast(typing.Mapping[str, str], config.api_headers()),
         timeout=config.timeout,
         follow_redirects=False,
+        http2=True,
+        limits=HTTP_LIMITS,
     )
 
 
@@ -78,15 +83,6 @@ def get_meta_file_path(remote_dir: ApiDirectoryEntry, config: KitsuConfig) -> pa
     return pathlib.Path(config.destination / remote_dir.name / INFO_FILENAME)
 
 
-def read_meta_file(meta_file_path: pathlib.Path) -> KitsuDirectoryMeta | None:
-    try:
-        with open(meta_file_path, encoding="utf-8") as f:
-            assert meta_file_path.parent.is_dir(), "parent directory must exist."
-            return KitsuDirectoryMeta.from_local_file(f, dir_path=meta_file_path.parent)
-    except FileNotFoundError:
-        return None
-
-
 @dataclasses.dataclass(frozen=True)
 class KitsuDirectoryEntry:
     remote_dir: ApiDirectoryEntry
@@ -110,7 +106,7 @@ class KitsuDirectoryEntry:
             remote_dir=remote_dir,
             meta_file_path=meta_file_path,
             dir_listing_url=f"{config.api_url}/api/entries/{remote_dir.entry_id}/files",
-            local_state=read_meta_file(meta_file_path),
+            local_state=read_directory_meta(meta_file_path.parent),
         )
 
     def should_visit_directory(self) -> bool:
@@ -131,14 +127,14 @@ class KitsuDirectoryEntry:
 
 def make_payload(
     directory: KitsuDirectoryEntry, found_files: typing.Iterable[ApiFileEntry]
-) -> typing.Sequence[KitsuSubtitleDownload]:
-    return [
+) -> typing.Iterable[KitsuSubtitleDownload]:
+    return (
         KitsuSubtitleDownload(
             url=SubtitleFileUrl(file.url),
             file_path=(directory.dir_path / file.name),
         )
         for file in found_files
-    ]
+    )
 
 
 def handle_response_status(response: httpx.Response):
@@ -172,19 +168,18 @@ async def get_catalog_dirs(client: httpx.AsyncClient, search_url: str) -> typing
 
 
 def trash_files_missing_on_remote(directory: KitsuDirectoryEntry, remote_files: typing.Sequence[ApiFileEntry]) -> None:
-    all_names = {
-        entry.name for entry in directory.dir_path.iterdir() if entry.is_file() and entry.name not in SKIP_FILES
-    }
+    with os.scandir(directory.dir_path) as it:
+        all_names = {entry.name for entry in it if entry.name not in SKIP_FILES and entry.is_file()}
     keep_names = {file.name for file in remote_files}
     move_names = all_names - keep_names
     if not move_names:
         return
     print(f"in dir {directory.remote_dir.name}: moving {len(move_names)} files to '{TRASH_DIR_NAME}'")
+    dir_path = os.fspath(directory.dir_path)
+    trash_path = os.path.join(dir_path, TRASH_DIR_NAME)
+    os.makedirs(trash_path, exist_ok=True)
     for file_name in move_names:
-        old_path = directory.dir_path / file_name
-        new_path = directory.dir_path / TRASH_DIR_NAME / file_name
-        new_path.parent.mkdir(exist_ok=True)
-        old_path.rename(new_path)
+        os.rename(os.path.join(dir_path, file_name), os.path.join(trash_path, file_name))
 
 
 class ApiSyncClient(ClientBase, client_type=ClientType.api):
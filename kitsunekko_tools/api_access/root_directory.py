@@ -4,12 +4,14 @@
 import dataclasses
 import datetime
 import json
+import os
 import pathlib
 import typing
 from collections.abc import Sequence
 from pprint import pprint
 
 from kitsunekko_tools.common import fs_name_strip
+from kitsunekko_tools.consts import INFO_FILENAME
 
 
 class ApiDirectoryFlagsDict(typing.TypedDict):
@@ -103,16 +105,28 @@ class KitsuDirectoryMeta(ApiDirectoryEntry):
     dir_path: pathlib.Path = pathlib.Path()
 
     @classmethod
-    def from_local_file(cls, f: typing.TextIO, dir_path: pathlib.Path) -> typing.Self:
+    def from_local_file(cls, f: typing.BinaryIO, dir_path: pathlib.Path) -> typing.Self:
         return cls(**cls._load_json(f), dir_path=dir_path)
 
     @staticmethod
-    def _load_json(f: typing.TextIO) -> dict:
+    def _load_json(f: typing.BinaryIO) -> dict:
+        # json detects UTF-8 in bytes by itself, so the text decoding layer is skipped.
         data = json.load(f)
         data["last_modified"] = parse_api_time(data["last_modified"])
         return data
 
 
+def read_directory_meta(dir_path: pathlib.Path) -> KitsuDirectoryMeta | None:
+    """
+    Read the metadata file of a local subtitle directory, if it has one.
+    """
+    try:
+        with open(os.path.join(dir_path, INFO_FILENAME), "rb") as f:
+            return KitsuDirectoryMeta.from_local_file(f, dir_path=dir_path)
+    except FileNotFoundError:
+        return None
+
+
 def iter_catalog_directories(json_response: Sequence[ApiDirectoryDict]) -> typing.Iterable[ApiDirectoryEntry]:
     for item in json_response:
         yield ApiDirectoryEntry.from_api_json(item)
@@ -1,19 +1,23 @@
 # Copyright: Ajatt-Tools and contributors; https://github.com/Ajatt-Tools
 # License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
 
-import abc
+import functools
 import re
+import typing
 
 
-class KitsuException(Exception, abc.ABC):
-    @property
-    @abc.abstractmethod
-    def what(self) -> str:
-        raise NotImplementedError()
+class KitsuException(Exception):
+    # Subclasses either store 'what' as a dataclass field or compute it with a property.
+    # The property is only declared for type checkers.
+    # At runtime it would make dataclass fields named 'what' impossible to set.
+    if typing.TYPE_CHECKING:
 
+        @property
+        def what(self) -> str: ...
 
+
+RE_TRAILING_DOTS_SPACES = re.compile(r"[.\s]+\Z")  # \s includes non-ASCII spaces, e.g. U+3000
 RE_FILENAME_PROHIBITED = re.compile(r"[ _\\\n\t\r#{}<>^*/:\"`?'|]+", flags=re.MULTILINE | re.IGNORECASE)
-RE_MULTI_SPACE = re.compile(r" {2,}", flags=re.MULTILINE | re.IGNORECASE)
 WINDOWS_SUBSTITUTE_CHARS = {
     "??": "2",
     "||": "2",
@@ -25,12 +29,18 @@ WINDOWS_SUBSTITUTE_CHARS = {
     "|": "⏐",
 }
 assert all(k != v for k, v in WINDOWS_SUBSTITUTE_CHARS.items())
+# Multi-character sequences are replaced first, then single characters are swapped with one translate() call.
+WINDOWS_SUBSTITUTE_SEQUENCES = {k: v for k, v in WINDOWS_SUBSTITUTE_CHARS.items() if len(k) > 1}
+WINDOWS_SUBSTITUTE_TABLE = str.maketrans({k: v for k, v in WINDOWS_SUBSTITUTE_CHARS.items() if len(k) == 1})
 
 
+@functools.lru_cache(maxsize=4096)
 def fs_name_strip(name: str) -> str:
-    for from_, to in WINDOWS_SUBSTITUTE_CHARS.items():
+    for from_, to in WINDOWS_SUBSTITUTE_SEQUENCES.items():
         name = name.replace(from_, to)
-    name = re.sub(RE_FILENAME_PROHIBITED, " ", name)
-    name = re.sub(RE_MULTI_SPACE, " ", name)
-    # Note: Windows-like OSes don't allow dots at the end.
-    return name.strip().rstrip(".")
+    name = name.translate(WINDOWS_SUBSTITUTE_TABLE)
+    # Each run of prohibited characters, spaces included, collapses into a single space.
+    name = RE_FILENAME_PROHIBITED.sub(" ", name)
+    # Note: Windows-like OSes don't allow dots or spaces at the end.
+    # Both are stripped together, so that a sanitized name stays the same when sanitized again.
+    return RE_TRAILING_DOTS_SPACES.sub("", name.strip())
@@ -29,6 +29,11 @@ def get_xdg_config_dir() -> pathlib.Path:
     return pathlib.Path(os.environ.get("XDG_CONFIG_HOME", pathlib.Path.home() / ".config"))
 
 
+@functools.cache
+def get_xdg_cache_dir() -> pathlib.Path:
+    return pathlib.Path(os.environ.get("XDG_CACHE_HOME", pathlib.Path.home() / ".cache"))
+
+
 @functools.cache
 def config_locations() -> typing.Sequence[pathlib.Path]:
     return (
@@ -102,6 +107,7 @@ class KitsuConfig:
     proxy: str | None = "socks5://127.0.0.1:9050"
     download_root: str = "https://kitsunekko.net/dirlist.php?dir=subtitles/japanese/"  # scrap target
     timeout: int = 120
+    concurrent_pages: int = 16  # number of kitsunekko pages that are crawled at the same time
     skip_older: datetime.timedelta = datetime.timedelta(days=30)  # 30 days
     api_url: str = "https://kitsunekko.net"  # URL of a subtitle server. Normally looks like 'https://example.com'.
     api_key: str = ""  # API key of the subtitle server
@@ -115,6 +121,8 @@ class KitsuConfig:
         instance = cls(**tomllib.load(file))
         if "dirlist.php?dir=" not in instance.download_root:
             raise ConfigFileInvalidError("Download root doesn't appear to be a valid kitsunekko URL.")
+        if instance.concurrent_pages < 1:
+            raise ConfigFileInvalidError("Number of concurrent pages must be at least 1.")
         return dataclasses.replace(
             instance,
             destination=pathlib.Path(instance.destination).expanduser(),
@@ -5,7 +5,9 @@ import asyncio
 import collections
 import dataclasses
 import enum
+import os
 import pathlib
+import stat
 import typing
 
 import httpx
@@ -16,6 +18,11 @@ from kitsunekko_tools.ignore import IgnoreList
 
 SubtitleFileUrl = typing.NewType("SubtitleFileUrl", str)
 
+# Downloads are multiplexed over HTTP/2, so a single host can take many requests at once.
+# All requests go to the same host, so idle connections are kept around for reuse
+# instead of paying for a new TCP/TLS (and possibly Tor circuit) handshake.
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=64, keepalive_expiry=300)
+
 
 @dataclasses.dataclass(frozen=True)
 class KitsuConnectionError(KitsuException):
@@ -37,7 +44,11 @@ def is_file_non_empty(file_path: pathlib.Path) -> bool:
     """
     Returns True if file exists and is not empty.
     """
-    return file_path.is_file() and file_path.stat().st_size > 0
+    try:
+        st = os.stat(file_path)
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+    return stat.S_ISREG(st.st_mode) and st.st_size > 0
 
 
 class KitsuSubtitleDownload(typing.NamedTuple):
@@ -99,7 +110,7 @@ class KitsuSubtitleDownloader:
     async def download_subs(
         self,
         client: httpx.AsyncClient,
-        to_download: typing.Sequence[KitsuSubtitleDownload],
+        to_download: typing.Iterable[KitsuSubtitleDownload],
     ) -> KitsuDownloadResults:
         tasks = tuple(self.download_sub(client, sub) for sub in to_download)
         results = KitsuDownloadResults()
@@ -3,6 +3,7 @@
 
 import dataclasses
 import pathlib
+import re
 import typing
 
 from kitsunekko_tools.common import KitsuException
@@ -15,6 +16,20 @@ class IgnoreListException(KitsuException):
     what: str
 
 
+def is_wildcard(pattern: str) -> bool:
+    # Saved file paths never contain '*' or '?' because they are sanitized with fs_name_strip().
+    # Brackets are common in file names, so they alone don't make a pattern a wildcard.
+    return "*" in pattern or "?" in pattern
+
+
+def wildcard_to_regex(pattern: str) -> str:
+    """
+    Translate a wildcard pattern to a regex.
+    Unlike fnmatch, only '*' and '?' are special. Brackets are matched literally.
+    """
+    return "".join(".*" if char == "*" else "." if char == "?" else re.escape(char) for char in pattern) + r"\Z"
+
+
 class IgnoreList:
     """
     Holds a list of files that should not be downloaded even if they're not present in expected locations.
@@ -23,6 +38,7 @@ class IgnoreList:
     _config: KitsuConfig
     _ignore_filepath: pathlib.Path
     _patterns: dict[str, None]
+    _wildcards: re.Pattern[str] | None  # all wildcard patterns, compiled into one regex on first use
     _dirty_level: int  # counts additions
     _autocommit_threshold: int
 
@@ -30,6 +46,7 @@ class IgnoreList:
         self._config = config
         self._ignore_filepath = pathlib.Path(self._config.destination) / IGNORE_FILENAME
         self._patterns = {}
+        self._wildcards = None
         self._dirty_level = 0
         self._autocommit_threshold = autocommit_threshold
         self._config.raise_for_destination()
@@ -46,8 +63,16 @@ class IgnoreList:
     def _pattern_from_path(self, file_path: pathlib.Path) -> str:
         return str(file_path.relative_to(self._config.destination))
 
+    def _compiled_wildcards(self) -> re.Pattern[str]:
+        if self._wildcards is None:
+            wildcards = [f"(?:{wildcard_to_regex(pattern)})" for pattern in self._patterns if is_wildcard(pattern)]
+            # an empty alternation would match everything, use a pattern that never matches instead.
+            self._wildcards = re.compile("|".join(wildcards) or r"(?!)", flags=re.DOTALL)
+        return self._wildcards
+
     def is_matching(self, file_path: pathlib.Path) -> bool:
-        return self._pattern_from_path(file_path) in self._patterns
+        pattern = self._pattern_from_path(file_path)
+        return pattern in self._patterns or self._compiled_wildcards().match(pattern) is not None
 
     def patterns(self) -> typing.Iterable[str]:
         """
@@ -61,6 +86,8 @@ class IgnoreList:
         """
         self._patterns[pattern] = None
         self._dirty_level += 1
+        if is_wildcard(pattern):
+            self._wildcards = None
 
     def add_file(self, file_path: pathlib.Path) -> None:
         """
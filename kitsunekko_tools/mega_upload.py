@@ -1,8 +1,9 @@
 # Copyright: Ajatt-Tools and contributors; https://github.com/Ajatt-Tools
 # License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
 import dataclasses
+import os
+import shutil
 import subprocess
-import sys
 
 from kitsunekko_tools.common import KitsuException
 from kitsunekko_tools.config import KitsuConfig
@@ -18,21 +19,24 @@ def raise_for_status(out: subprocess.CompletedProcess):
         raise MegaError(f"Command failed with code {out.returncode}")
 
 
+def run_mega_command(program: str, *args: str | os.PathLike) -> subprocess.CompletedProcess:
+    """
+    Run a megatools command. Its output goes straight to the terminal.
+    """
+    if not (executable := shutil.which(program)):
+        raise MegaError(f"Couldn't find {program}. Is megatools installed?")
+    # With an absolute executable path, inherited standard streams and close_fds=False,
+    # subprocess starts the child with posix_spawn() instead of fork() + exec().
+    # Descriptors opened by Python are non-inheritable, so keeping them open is safe.
+    return subprocess.run(args=(executable, *args), check=False, close_fds=False)
+
+
 def mega_upload(config: KitsuConfig):
     remote_destination = f"/Root/{config.destination.name}"
-    print(f"Remote destination: {remote_destination}")
-
-    subprocess.run(  # will return 1 if directory already exists.
-        args=("megamkdir", remote_destination),
-        stdout=sys.stdout,
-        stderr=sys.stderr,
-        check=False,
-    )
-
-    out = subprocess.run(
-        args=("megacopy", "--local", config.destination, "--remote", remote_destination, "--no-follow"),
-        stdout=sys.stdout,
-        stderr=sys.stderr,
-        check=False,
-    )
+    print(f"Remote destination: {remote_destination}", flush=True)
+
+    # will return 1 if directory already exists.
+    run_mega_command("megamkdir", remote_destination)
+
+    out = run_mega_command("megacopy", "--local", config.destination, "--remote", remote_destination, "--no-follow")
     raise_for_status(out)
@@ -1,105 +1,267 @@
 # Copyright: Ajatt-Tools and contributors; https://github.com/Ajatt-Tools
 # License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+import collections
+import concurrent.futures
+import hashlib
+import os
 import pathlib
+import time
 
-from kitsunekko_tools.api_access.root_directory import EntryId, KitsuDirectoryMeta
+from kitsunekko_tools.api_access.root_directory import (
+    EntryId,
+    KitsuDirectoryMeta,
+    read_directory_meta,
+)
 from kitsunekko_tools.common import fs_name_strip
-from kitsunekko_tools.config import KitsuConfig
-from kitsunekko_tools.consts import IGNORE_FILENAME, INFO_FILENAME, TRASH_DIR_NAME
+from kitsunekko_tools.config import KitsuConfig, get_xdg_cache_dir
+from kitsunekko_tools.consts import (
+    IGNORE_FILENAME,
+    INFO_FILENAME,
+    PROG_NAME,
+    TRASH_DIR_NAME,
+)
 
-SKIP_FILES = (IGNORE_FILENAME, INFO_FILENAME, TRASH_DIR_NAME)
+SKIP_FILES = frozenset((IGNORE_FILENAME, INFO_FILENAME, TRASH_DIR_NAME))
+
+
+def move_file_no_replace(src: str, dst: str) -> None:
+    """
+    Move src to dst. If dst already exists, keep it and delete src.
+    Unlike os.rename(), which silently replaces dst, os.link() fails atomically if dst exists.
+    """
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        pass
+    except OSError:
+        # The file system doesn't support hard links.
+        if not os.path.exists(dst):
+            os.rename(src, dst)
+            return
+    os.unlink(src)
 
 
 def move_files(old_dir: pathlib.Path, new_dir: pathlib.Path) -> None:
-    for entry in old_dir.iterdir():
-        if entry.is_dir():
-            move_files(entry, new_dir / entry.name)
-            continue
-        if entry.name in SKIP_FILES:
-            continue
-        assert entry.is_file(), "entry must be a file."
-        new_path = new_dir / entry.relative_to(old_dir)
-        new_path.parent.mkdir(exist_ok=True)
-        if new_path.exists():
-            entry.unlink()
+    """
+    Move the content of old_dir to new_dir and delete old_dir.
+    Files that already exist in new_dir are kept, and their counterparts in old_dir are deleted.
+    """
+    to_move: list[tuple[str, str]] = [(os.fspath(old_dir), os.fspath(new_dir))]
+    emptied: list[str] = []  # parents always come before their subdirectories
+    while to_move:
+        src_dir, dst_dir = to_move.pop()
+        try:
+            # If the destination doesn't exist or is empty, the whole directory is moved at once.
+            os.rename(src_dir, dst_dir)
+        except OSError:
+            pass
         else:
-            entry.rename(new_path)
-    nuke_dir(old_dir)
+            continue
+        os.makedirs(dst_dir, exist_ok=True)
+        with os.scandir(src_dir) as it:
+            entries = [*it]
+        for entry in entries:
+            dst_path = os.path.join(dst_dir, entry.name)
+            if entry.is_dir():
+                to_move.append((entry.path, dst_path))
+                continue
+            if entry.name in SKIP_FILES:
+                continue
+            assert entry.is_file(), "entry must be a file."
+            move_file_no_replace(entry.path, dst_path)
+        emptied.append(src_dir)
+    for directory in reversed(emptied):
+        nuke_dir(directory)
+
+
+def nuke_dir(directory: str | os.PathLike[str]) -> None:
+    try:
+        os.unlink(os.path.join(directory, INFO_FILENAME))
+    except FileNotFoundError:
+        pass
+    try:
+        # an empty trash folder doesn't count as content.
+        os.rmdir(os.path.join(directory, TRASH_DIR_NAME))
+    except FileNotFoundError:
+        pass
+    os.rmdir(directory)
+
+
+def list_subtitle_directories(config: KitsuConfig) -> list[os.DirEntry[str]]:
+    """
+    List directories in the destination folder.
+    The listing is taken in full, so that the caller can rename or delete directories while iterating.
+    """
+    with os.scandir(config.destination) as it:
+        return [entry for entry in it if entry.name not in SKIP_FILES and entry.is_dir()]
+
 
+def move_directories(moves: dict[pathlib.Path, list[pathlib.Path]]) -> None:
+    """
+    Move each group of directories into its destination.
+    Groups have distinct destinations and don't touch each other's files, so they are moved in parallel.
+    Directories that share a destination are moved one after another.
+    """
 
-def nuke_dir(directory: pathlib.Path) -> None:
-    (directory / INFO_FILENAME).unlink(missing_ok=True)
-    directory.rmdir()
+    def move_group(new_dir: pathlib.Path, old_dirs: list[pathlib.Path]) -> None:
+        for old_dir in old_dirs:
+            print(f"moving '{old_dir}' to '{new_dir}'")
+            move_files(old_dir, new_dir)
+
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        futures = [executor.submit(move_group, new_dir, old_dirs) for new_dir, old_dirs in moves.items()]
+        for future in futures:
+            future.result()
 
 
 def rename_badly_named_directories(config: KitsuConfig) -> None:
-    for directory in config.destination.iterdir():
-        if directory.name in SKIP_FILES:
-            continue
-        sanitized_name = fs_name_strip(directory.name)
-        if sanitized_name == directory.name:
+    moves: dict[pathlib.Path, list[pathlib.Path]] = collections.defaultdict(list)
+    for entry in list_subtitle_directories(config):
+        sanitized_name = fs_name_strip(entry.name)
+        if sanitized_name == entry.name:
             continue
-        new_dir = directory.parent / sanitized_name
-        print(f"moving '{directory}' to '{new_dir}'")
-        if new_dir.exists():
-            move_files(directory, new_dir)
-        else:
-            directory.rename(new_dir)
+        # move_files() renames the directory as a whole if the new one doesn't exist yet.
+        # fs_name_strip() is idempotent, so a destination is never renamed by another group.
+        moves[config.destination / sanitized_name].append(pathlib.Path(entry.path))
+    move_directories(moves)
+
+
+def lookup_key(name: str) -> str:
+    """
+    Names are compared case-insensitively.
+    """
+    return name.lower()
+
+
+def dir_lookup_keys(directory: pathlib.Path, meta: KitsuDirectoryMeta) -> tuple[str, ...]:
+    """
+    Return all names the directory can be known by.
+    """
+    return tuple(map(lookup_key, filter(None, (directory.name, meta.english_name, meta.japanese_name))))
 
 
 def merge_directories(config: KitsuConfig) -> None:
     id2master: dict[EntryId, KitsuDirectoryMeta] = {}
     name2id: dict[str, EntryId] = {}
+    path2id: dict[str, EntryId] = {}  # directories that have their own metadata file
+    directories = list_subtitle_directories(config)
 
-    for directory in config.destination.iterdir():
-        if directory.name in SKIP_FILES:
-            continue
-        try:
-            with open(directory / INFO_FILENAME, encoding="utf-8") as f:
-                meta = KitsuDirectoryMeta.from_local_file(f, dir_path=directory)
-        except FileNotFoundError:
+    for entry in directories:
+        directory = pathlib.Path(entry.path)
+        if (meta := read_directory_meta(directory)) is None:
             continue
 
-        if meta.entry_id not in id2master:
-            id2master[meta.entry_id] = meta
-        else:
-            id2master[meta.entry_id] = meta = max(meta, id2master[meta.entry_id], key=lambda d: d.last_modified)
+        entry_id = path2id[entry.path] = meta.entry_id
+        # setdefault() stores the first directory with this ID and returns the stored one in one dict probe.
+        master = id2master.setdefault(entry_id, meta)
+        if master is not meta:
+            # the most recently modified directory becomes the master. ties go to the later one.
+            if meta.last_modified >= master.last_modified:
+                id2master[entry_id] = meta
+            else:
+                meta = master
 
-        name2id[directory.name.lower()] = meta.entry_id
-        if meta.english_name:
-            name2id[meta.english_name.lower()] = meta.entry_id
-        if meta.japanese_name:
-            name2id[meta.japanese_name.lower()] = meta.entry_id
+        for key in dir_lookup_keys(directory, meta):
+            name2id[key] = entry_id
 
-    for directory in config.destination.iterdir():
-        if directory.name in SKIP_FILES:
+    moves: dict[pathlib.Path, list[pathlib.Path]] = collections.defaultdict(list)
+    for entry in directories:
+        # The ID stored in the directory's own metadata is authoritative. Names are only a fallback.
+        found_id: EntryId | None = path2id.get(entry.path)
+        if found_id is None:
+            found_id = name2id.get(lookup_key(entry.name))
+        if found_id is None:
             continue
-        try:
-            master_entry = id2master[name2id[directory.name.lower()]]
-        except KeyError:
-            continue
-        if master_entry.dir_path == directory:
-            continue
-        else:
-            print(f"moving '{directory}' to '{master_entry.dir_path}'")
-            move_files(directory, master_entry.dir_path)
+        master_entry = id2master[found_id]
+        directory = pathlib.Path(entry.path)
+        if master_entry.dir_path != directory:
+            moves[master_entry.dir_path].append(directory)
+    # master directories are never moved themselves, so sources and destinations don't overlap.
+    move_directories(moves)
 
 
-def delete_empty_directories(config: KitsuConfig) -> None:
-    for directory in config.destination.iterdir():
-        if directory.name in SKIP_FILES:
-            continue
-        entries = [entry for entry in directory.iterdir() if entry.name not in SKIP_FILES]
-        try:
-            extra_files = [*directory.joinpath(TRASH_DIR_NAME).iterdir()]
-        except FileNotFoundError:
-            extra_files = []
-        if not entries and not extra_files:
-            print(f"deleting empty dir: {directory}")
-            nuke_dir(directory)
+def is_empty_subtitle_dir(directory: os.DirEntry[str]) -> bool:
+    has_trash = False
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name == TRASH_DIR_NAME:
+                has_trash = entry.is_dir()
+            elif entry.name not in SKIP_FILES:
+                return False
+    if not has_trash:
+        return True
+    # the trash folder doesn't count as content if it's empty.
+    with os.scandir(os.path.join(directory, TRASH_DIR_NAME)) as it:
+        return not any(it)
+
+
+def is_modified_since(directory: os.DirEntry[str], timestamp_ns: int) -> bool:
+    """
+    Adding or removing files only updates the mtime of the folder that holds them.
+    Subtitle files are kept both in the directory and in its trash folder, so both are checked.
+    """
+    if directory.stat().st_mtime_ns >= timestamp_ns:
+        return True
+    try:
+        return os.stat(os.path.join(directory, TRASH_DIR_NAME)).st_mtime_ns >= timestamp_ns
+    except FileNotFoundError:
+        return False
+
+
+def delete_empty_directories(config: KitsuConfig, modified_since_ns: int = 0) -> None:
+    """
+    Delete directories that have no subtitle files.
+    Directories that haven't changed since 'modified_since_ns' are skipped:
+    they weren't empty back then, and adding or removing files would have updated their mtime
+    or the mtime of their trash folder.
+    """
+
+    def is_deletable(directory: os.DirEntry[str]) -> bool:
+        return is_modified_since(directory, modified_since_ns) and is_empty_subtitle_dir(directory)
+
+    directories = list_subtitle_directories(config)
+    # Listing directories is bound by disk latency, so the listings are done in parallel.
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        for directory, is_empty in zip(directories, executor.map(is_deletable, directories)):
+            if is_empty:
+                print(f"deleting empty dir: {directory.path}")
+                nuke_dir(directory)
+
+
+# File systems store timestamps with a coarser clock than time.time_ns(),
+# down to 2 seconds on FAT, so the recorded start time is moved back a little.
+STAMP_MARGIN_NS = 2_000_000_000
+
+
+def sanitize_stamp_path(config: KitsuConfig) -> pathlib.Path:
+    """
+    The destination is shared with git and mega, so local state is kept in the cache directory.
+    Each destination gets its own stamp.
+    """
+    destination_key = hashlib.sha1(os.fsencode(config.destination.resolve())).hexdigest()
+    return get_xdg_cache_dir() / PROG_NAME / f"sanitize-{destination_key}.stamp"
+
+
+def read_sanitize_stamp(config: KitsuConfig) -> int:
+    """
+    Return the time when sanitize last finished successfully, or 0 if it never did.
+    """
+    try:
+        return os.stat(sanitize_stamp_path(config)).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def write_sanitize_stamp(config: KitsuConfig, timestamp_ns: int) -> None:
+    stamp_file_path = sanitize_stamp_path(config)
+    stamp_file_path.parent.mkdir(parents=True, exist_ok=True)
+    stamp_file_path.touch()
+    os.utime(stamp_file_path, ns=(timestamp_ns, timestamp_ns))
 
 
-def sanitize_directories(config: KitsuConfig) -> None:
+def sanitize_directories(config: KitsuConfig, full: bool = False) -> None:
+    started_at_ns = time.time_ns() - STAMP_MARGIN_NS
     rename_badly_named_directories(config)
     merge_directories(config)
-    delete_empty_directories(config)
+    delete_empty_directories(config, modified_since_ns=(0 if full else read_sanitize_stamp(config)))
+    write_sanitize_stamp(config, started_at_ns)
@@ -3,7 +3,9 @@
 
 import asyncio
 import datetime
+import pathlib
 import typing
+import urllib.parse
 from collections.abc import Sequence
 
 import httpx
@@ -11,6 +13,7 @@ import httpx
 from kitsunekko_tools.config import KitsuConfig
 from kitsunekko_tools.download import ClientBase, ClientType
 from kitsunekko_tools.file_downloader import (
+    HTTP_LIMITS,
     KitsuConnectionError,
     KitsuDownloadResults,
     KitsuSubtitleDownload,
@@ -38,26 +41,37 @@ class PageCrawlResult(typing.NamedTuple):
         )
 
 
-class FetchResult(typing.NamedTuple):
-    to_visit: set[AnimeDir]
-    to_download: set[SubtitleFile]
-    visited: set[AnimeDir]
+def url_visit_key(url: str) -> str:
+    """
+    Directory URLs that differ only in percent-encoding (e.g. '%2F' and '/', '+' and '%20') point to the same page.
+    """
+    return urllib.parse.unquote_plus(url)
+
+
+class FetchState(typing.NamedTuple):
+    to_visit: asyncio.Queue[AnimeDir]
+    # Decoded URLs (see url_visit_key) of every directory that has been queued, to avoid queuing it twice.
+    # Show names can't be used: different names may sanitize to the same string.
+    visited: set[str]
     results: KitsuDownloadResults
 
     @classmethod
-    def new(cls):
-        return cls(
-            to_visit=set(),
-            to_download=set(),
+    def new(cls, download_root_url: str) -> typing.Self:
+        state = cls(
+            to_visit=asyncio.Queue(),
             visited=set(),
             results=KitsuDownloadResults(),
         )
+        state.enqueue([AnimeDir(download_root_url, "subtitles", datetime.datetime.now())])
+        return state
 
-    def update(self, dir_result: PageCrawlResult, downloads: KitsuDownloadResults):
-        self.to_visit.update(dir_result.found_dirs)
-        self.to_download.update(dir_result.found_files)
-        self.visited.add(dir_result.visited_dir)
-        self.results.update(downloads)
+    def enqueue(self, found_dirs: typing.Iterable[AnimeDir]) -> None:
+        for anime_dir in found_dirs:
+            visit_key = url_visit_key(anime_dir.url)
+            if visit_key in self.visited:
+                continue
+            self.visited.add(visit_key)
+            self.to_visit.put_nowait(anime_dir)
 
     def __str__(self) -> str:
         return str(
@@ -67,45 +81,29 @@ class FetchResult(typing.NamedTuple):
         )
 
 
-class FetchState(typing.NamedTuple):
-    to_visit: set[AnimeDir]
-    visited: set[AnimeDir]
-
-    @classmethod
-    def new(cls, download_root_url: str) -> typing.Self:
-        return cls(
-            to_visit={
-                AnimeDir(download_root_url, "subtitles", datetime.datetime.now()),
-            },
-            visited=set(),
-        )
-
-    def balance(self, prev_result: FetchResult) -> None:
-        self.visited.update(self.to_visit)
-        self.to_visit.clear()
-        self.to_visit.update(prev_result.to_visit - self.visited)
-
-    def has_unvisited(self) -> bool:
-        return len(self.to_visit) > 0
-
-
 def get_http_client(config: KitsuConfig) -> httpx.AsyncClient:
     return httpx.AsyncClient(
         proxy=config.proxy,
         headers=config.headers,
         timeout=config.timeout,
         follow_redirects=False,
+        http2=True,
+        limits=HTTP_LIMITS,
     )
 
 
-def make_payload(config: KitsuConfig, found_files: Sequence[SubtitleFile]) -> Sequence[KitsuSubtitleDownload]:
-    return [
-        KitsuSubtitleDownload(
+def make_payload(config: KitsuConfig, found_files: Sequence[SubtitleFile]) -> typing.Iterable[KitsuSubtitleDownload]:
+    # files on a page normally belong to one show, so its directory path is only built once.
+    show_dirs: dict[str, pathlib.Path] = {}
+    for file in found_files:
+        try:
+            show_dir = show_dirs[file.show_name]
+        except KeyError:
+            show_dir = show_dirs[file.show_name] = config.destination / file.show_name
+        yield KitsuSubtitleDownload(
             url=SubtitleFileUrl(file.url),
-            file_path=(config.destination / file.show_name / file.file_name),
+            file_path=(show_dir / file.file_name),
         )
-        for file in found_files
-    ]
 
 
 class KitsuScrapper(ClientBase, client_type=ClientType.kitsu_scrapper):
@@ -113,6 +111,7 @@ class KitsuScrapper(ClientBase, client_type=ClientType.kitsu_scrapper):
     _ignore: IgnoreList
     _downloader: KitsuSubtitleDownloader
     _now: datetime.datetime
+    _cutoff: datetime.datetime  # pages and files modified before this moment are skipped
     _full_sync: bool
 
     def __init__(self, client_type: ClientType, config: KitsuConfig, full_sync: bool = False) -> None:
@@ -123,15 +122,9 @@ class KitsuScrapper(ClientBase, client_type=ClientType.kitsu_scrapper):
         self._downloader = KitsuSubtitleDownloader(self._config, self._ignore)
         self._now = datetime.datetime.now()
         self._full_sync = full_sync
-
-    def _should_visit(self, location: AnimeDir | SubtitleFile) -> bool:
-        """
-        The page is visited if it was modified recently enough.
-        On full sync, visit and download everything.
-        """
-        if self._full_sync:
-            return True
-        return location.mod_timestamp >= (self._now - self._config.skip_older)
+        # A page is visited if it was modified recently enough.
+        # On full sync, visit and download everything.
+        self._cutoff = datetime.datetime.min if self._full_sync else self._now - self._config.skip_older
 
     async def crawl_page(self, client: httpx.AsyncClient, anime_dir: AnimeDir) -> PageCrawlResult:
         try:
@@ -139,33 +132,46 @@ class KitsuScrapper(ClientBase, client_type=ClientType.kitsu_scrapper):
         except Exception as e:
             raise KitsuConnectionError(anime_dir.url) from e
 
+        html_text = r.text  # decode the page once and reuse it for both scans.
         return PageCrawlResult(
             visited_dir=anime_dir,
-            found_dirs=[*filter(self._should_visit, find_all_subtitle_dirs(r.text))],
-            found_files=[*filter(self._should_visit, find_all_subtitle_files(r.text))],
+            found_dirs=[*find_all_subtitle_dirs(html_text, self._cutoff)],
+            found_files=[*find_all_subtitle_files(html_text, self._cutoff)],
         )
 
-    async def find_subs_all(self, client: httpx.AsyncClient, to_visit: set[AnimeDir]) -> FetchResult:
-        results = FetchResult.new()
-        for fut in asyncio.as_completed([self.crawl_page(client, page) for page in to_visit]):
+    async def _visit_page(self, client: httpx.AsyncClient, anime_dir: AnimeDir, state: FetchState) -> None:
+        try:
+            page_visit = await self.crawl_page(client, anime_dir)
+        except KitsuConnectionError as ex:
+            print(ex)
+            return
+        print(page_visit)
+        # queue the found directories before downloading, so that idle crawlers can pick them up.
+        state.enqueue(page_visit.found_dirs)
+        downloads = await self._downloader.download_subs(
+            client=client,
+            to_download=make_payload(self._config, page_visit.found_files),
+        )
+        state.results.update(downloads)
+
+    async def _crawl_worker(self, client: httpx.AsyncClient, state: FetchState) -> typing.NoReturn:
+        while True:
+            anime_dir = await state.to_visit.get()
             try:
-                page_visit: PageCrawlResult = await fut
-            except KitsuConnectionError as ex:
-                print(ex)
-            else:
-                print(page_visit)
-                downloads = await self._downloader.download_subs(
-                    client=client,
-                    to_download=make_payload(self._config, page_visit.found_files),
-                )
-                results.update(page_visit, downloads)
-        return results
+                await self._visit_page(client, anime_dir, state)
+            finally:
+                state.to_visit.task_done()
 
     async def sync_all(self) -> None:
-        async with get_http_client(self._config) as client:
+        """
+        Crawl pages and download the found files at the same time.
+        Each crawler takes the next page as soon as it's done with the previous one.
+        """
+        async with get_http_client(self._config) as client, asyncio.TaskGroup() as tg:
             state = FetchState.new(self._config.download_root)
-            while state.has_unvisited():
-                task: FetchResult = await self.find_subs_all(client, state.to_visit)
-                print(task)
-                state.balance(task)
+            workers = [tg.create_task(self._crawl_worker(client, state)) for _ in range(self._config.concurrent_pages)]
+            await state.to_visit.join()
+            for worker in workers:
+                worker.cancel()
+        print(state)
         self._ignore.commit()
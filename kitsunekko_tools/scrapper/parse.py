@@ -2,6 +2,7 @@
 # License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
 
 import datetime
+import functools
 import itertools
 import pathlib
 import re
@@ -15,8 +16,51 @@ from kitsunekko_tools.scrapper.types import AnimeDir, SubtitleFile
 MOD_TIMESTAMP_FORMAT = "%b %d %Y %I:%M:%S %p"  # timestamp format used on kitsunekko
 
 
+# kitsunekko always uses English month names, regardless of the local locale.
+MONTHS = {
+    "Jan": 1,
+    "Feb": 2,
+    "Mar": 3,
+    "Apr": 4,
+    "May": 5,
+    "Jun": 6,
+    "Jul": 7,
+    "Aug": 8,
+    "Sep": 9,
+    "Oct": 10,
+    "Nov": 11,
+    "Dec": 12,
+}
+
+
+# Input that the fast path of datetime_from_str() can slice. Anything else goes to strptime().
+RE_FIXED_WIDTH_TIMESTAMP = re.compile(r"[A-Za-z]{3} \d\d \d{4} \d\d:\d\d:\d\d [AP]M", flags=re.ASCII)
+
+
 def datetime_from_str(mod_timestamp: str) -> datetime.datetime:
-    return datetime.datetime.strptime(mod_timestamp, MOD_TIMESTAMP_FORMAT)
+    """
+    Kitsunekko always prints timestamps as fixed-width fields, e.g. "Jul 15 2012 09:24:15 PM".
+    Slicing them is much faster than strptime(), which is only used for unexpected input.
+    """
+    if RE_FIXED_WIDTH_TIMESTAMP.fullmatch(mod_timestamp) is None:
+        return datetime.datetime.strptime(mod_timestamp, MOD_TIMESTAMP_FORMAT)
+    try:
+        hour = int(mod_timestamp[12:14])
+        if not 1 <= hour <= 12:
+            raise ValueError(mod_timestamp)
+        hour %= 12
+        if mod_timestamp[21:23] == "PM":
+            hour += 12
+        return datetime.datetime(
+            year=int(mod_timestamp[7:11]),
+            month=MONTHS[mod_timestamp[0:3]],
+            day=int(mod_timestamp[4:6]),
+            hour=hour,
+            minute=int(mod_timestamp[15:17]),
+            second=int(mod_timestamp[18:20]),
+        )
+    except (KeyError, ValueError):
+        return datetime.datetime.strptime(mod_timestamp, MOD_TIMESTAMP_FORMAT)
 
 
 RE_FLAGS = re.IGNORECASE
@@ -36,29 +80,48 @@ RE_SUBTITLE_FILE = re.compile(
 )
 
 
+@functools.lru_cache(maxsize=8192)
 def sanitize_name(title: str) -> str:
     return fs_name_strip(urllib.parse.unquote(title))
 
 
-def find_all_subtitle_dirs(html_text: str) -> typing.Iterable[AnimeDir]:
-    for match in re.finditer(RE_SUBTITLE_DIR, html_text):
+def find_all_subtitle_dirs(
+    html_text: str,
+    modified_since: datetime.datetime = datetime.datetime.min,
+) -> typing.Iterable[AnimeDir]:
+    """
+    Rows modified before `modified_since` are skipped without building their entries.
+    """
+    for match in RE_SUBTITLE_DIR.finditer(html_text):
+        # timestamp input looks like "Jul 15 2012 09:24:15 PM"
+        mod_timestamp = datetime_from_str(match.group("mod_timestamp").strip())
+        if mod_timestamp < modified_since:
+            continue
         yield AnimeDir(
             url=f"{KITSUNEKKO_DOMAIN_URL}/{match.group('abs_path')}",
             show_name=sanitize_name(match.group("show_name")),
-            # timestamp input looks like "Jul 15 2012 09:24:15 PM"
-            mod_timestamp=datetime_from_str(match.group("mod_timestamp").strip()),
+            mod_timestamp=mod_timestamp,
         )
 
 
-def find_all_subtitle_files(html_text: str) -> typing.Iterable[SubtitleFile]:
-    for match in re.finditer(RE_SUBTITLE_FILE, html_text):
+def find_all_subtitle_files(
+    html_text: str,
+    modified_since: datetime.datetime = datetime.datetime.min,
+) -> typing.Iterable[SubtitleFile]:
+    """
+    Rows modified before `modified_since` are skipped without building their entries.
+    """
+    for match in RE_SUBTITLE_FILE.finditer(html_text):
+        # timestamp input looks like "Jul 15 2012 09:24:15 PM"
+        mod_timestamp = datetime_from_str(match.group("mod_timestamp").strip())
+        if mod_timestamp < modified_since:
+            continue
         show_name, file_name = match.group("abs_path").split("/")[-2:]
         yield SubtitleFile(
             url=f"{KITSUNEKKO_DOMAIN_URL}/{urllib.parse.quote(match.group('abs_path'))}",
             show_name=sanitize_name(show_name),
             file_name=sanitize_name(file_name),
-            # timestamp input looks like "Jul 15 2012 09:24:15 PM"
-            mod_timestamp=datetime_from_str(match.group("mod_timestamp").strip()),
+            mod_timestamp=mod_timestamp,
         )
 
 
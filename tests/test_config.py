@@ -0,0 +1,17 @@
+# Copyright: Ajatt-Tools and contributors; https://github.com/Ajatt-Tools
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+import io
+
+import pytest
+
+from kitsunekko_tools.config import ConfigFileInvalidError, KitsuConfig
+
+
+@pytest.mark.parametrize("concurrent_pages", [0, -1])
+def test_concurrent_pages_must_be_positive(concurrent_pages: int) -> None:
+    with pytest.raises(ConfigFileInvalidError):
+        KitsuConfig.from_file(io.BytesIO(f"concurrent_pages = {concurrent_pages}".encode()))
+
+
+def test_concurrent_pages_is_read() -> None:
+    assert KitsuConfig.from_file(io.BytesIO(b"concurrent_pages = 4")).concurrent_pages == 4
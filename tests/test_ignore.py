@@ -0,0 +1,48 @@
+# Copyright: Ajatt-Tools and contributors; https://github.com/Ajatt-Tools
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+import pathlib
+
+import pytest
+
+from kitsunekko_tools.config import KitsuConfig
+from kitsunekko_tools.ignore import IgnoreList
+
+
+@pytest.fixture
+def ignore_list(tmp_path: pathlib.Path) -> IgnoreList:
+    return IgnoreList(KitsuConfig(destination=tmp_path))
+
+
+@pytest.mark.parametrize(
+    "pattern, file_path, expected",
+    [
+        ("Show/ep1.ass", "Show/ep1.ass", True),
+        ("Show/ep1.ass", "Show/ep2.ass", False),
+        ("Show/*.rar", "Show/ep1.rar", True),
+        ("Show/*.rar", "Show/ep1.ass", False),
+        ("[Group] Show/*.rar", "[Group] Show/ep1.rar", True),
+        ("[Group] Show/*.rar", "G Show/ep1.rar", False),
+        ("Show/[Sub] ep?.ass", "Show/[Sub] ep1.ass", True),
+        ("Show/[Sub] ep?.ass", "Show/[Sub] ep10.ass", False),
+        ("Show (2024)/ep+1.ass", "Show (2024)/ep+1.ass", True),
+    ],
+)
+def test_is_matching(ignore_list: IgnoreList, pattern: str, file_path: str, expected: bool) -> None:
+    ignore_list.add(pattern)
+    assert ignore_list.is_matching(ignore_list.ignore_filepath.parent / file_path) is expected
+
+
+def test_add_recompiles_wildcards(ignore_list: IgnoreList) -> None:
+    file_path = ignore_list.ignore_filepath.parent / "Show/ep1.rar"
+    ignore_list.add("Other/*.rar")
+    assert not ignore_list.is_matching(file_path)
+    ignore_list.add("Show/*.rar")
+    assert ignore_list.is_matching(file_path), "wildcards added after the first match should be used"
+
+
+def test_patterns_are_read_from_file(tmp_path: pathlib.Path) -> None:
+    ignore_list = IgnoreList(KitsuConfig(destination=tmp_path))
+    ignore_list.add("[Group] Show/*.zip")
+    ignore_list.commit()
+    reloaded = IgnoreList(KitsuConfig(destination=tmp_path))
+    assert reloaded.is_matching(tmp_path / "[Group] Show" / "ep1.zip")
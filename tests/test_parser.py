@@ -9,8 +9,10 @@ import pytest
 
 from kitsunekko_tools.consts import KITSUNEKKO_DOMAIN_URL
 from kitsunekko_tools.scrapper.parse import (
+    MOD_TIMESTAMP_FORMAT,
     AnimeDir,
     SubtitleFile,
+    datetime_from_str,
     find_all_subtitle_dirs,
     find_all_subtitle_files,
 )
@@ -45,20 +47,20 @@ EXPECTED_FILES = [
 ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def found_dirs() -> Sequence[AnimeDir]:
     root_html_text = DATA_DIR.joinpath("main_dir_page.html").read_text()
     return [*find_all_subtitle_dirs(root_html_text)]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def parsed_sub_files() -> Sequence[SubtitleFile]:
     anime_dir_html_text = DATA_DIR.joinpath("subs_page.html").read_text()
     return [*find_all_subtitle_files(anime_dir_html_text)]
 
 
 def test_shows_in_root_dir(found_dirs: Sequence[AnimeDir]) -> None:
-    assert all(dir_ in found_dirs for dir_ in EXPECTED_DIRS), "result should include expected dirs"
+    assert set(EXPECTED_DIRS) <= set(found_dirs), "result should include expected dirs"
 
 
 def test_num_of_found_dirs(found_dirs: Sequence[AnimeDir]) -> None:
@@ -66,8 +68,34 @@ def test_num_of_found_dirs(found_dirs: Sequence[AnimeDir]) -> None:
 
 
 def test_files_in_directory(parsed_sub_files: Sequence[SubtitleFile]) -> None:
-    assert all(file in parsed_sub_files for file in EXPECTED_FILES), "result should include expected files"
+    assert set(EXPECTED_FILES) <= set(parsed_sub_files), "result should include expected files"
 
 
 def test_num_of_found_files(parsed_sub_files: Sequence[SubtitleFile]) -> None:
     assert len(parsed_sub_files) == 67, "number of files should match"
+
+
+@pytest.mark.parametrize(
+    "mod_timestamp",
+    ["Jul 15 2012 09:24:15 PM", "Jan 01 2020 12:00:00 AM", "Dec 31 2023 12:59:59 PM", "Jul 5 2012 9:24:15 PM"],
+)
+def test_datetime_from_str(mod_timestamp: str) -> None:
+    expected = datetime.datetime.strptime(mod_timestamp, MOD_TIMESTAMP_FORMAT)
+    assert datetime_from_str(mod_timestamp) == expected, "fast path should agree with strptime"
+
+
+def test_modified_since(found_dirs: Sequence[AnimeDir]) -> None:
+    modified_since = datetime.datetime(2024, 4, 1)
+    root_html_text = DATA_DIR.joinpath("main_dir_page.html").read_text()
+    recent_dirs = [*find_all_subtitle_dirs(root_html_text, modified_since)]
+    assert recent_dirs == [dir_ for dir_ in found_dirs if dir_.mod_timestamp >= modified_since]
+    assert 0 < len(recent_dirs) < len(found_dirs), "only recently modified dirs should be kept"
+
+
+@pytest.mark.parametrize(
+    "mod_timestamp",
+    ["Jul 15 2012 09:24:15 PMx", "Jul 15 2012 +9:24:15 PM", "Jul 15 2012 09: 4:15 PM", "Jul 15 2012 13:24:15 PM"],
+)
+def test_datetime_from_str_rejects_malformed(mod_timestamp: str) -> None:
+    with pytest.raises(ValueError):
+        datetime_from_str(mod_timestamp)
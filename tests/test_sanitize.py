@@ -0,0 +1,45 @@
+# Copyright: Ajatt-Tools and contributors; https://github.com/Ajatt-Tools
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+import os
+import pathlib
+import time
+
+import pytest
+
+from kitsunekko_tools.common import fs_name_strip
+from kitsunekko_tools.config import KitsuConfig
+from kitsunekko_tools.consts import TRASH_DIR_NAME
+from kitsunekko_tools.sanitize import (
+    delete_empty_directories,
+    rename_badly_named_directories,
+)
+
+
+@pytest.mark.parametrize(
+    "name", ["Show .", "Show ", "Show . .", "Show: ?", " .Show|. ", "Sh'ow?? ...", "Show\u3000.", "Show .\u3000\xa0."]
+)
+def test_fs_name_strip_is_idempotent(name: str) -> None:
+    assert fs_name_strip(fs_name_strip(name)) == fs_name_strip(name)
+
+
+def test_rename_chained_names(tmp_path: pathlib.Path) -> None:
+    # "Show ." sanitizes to the same name as "Show ", which is itself badly named.
+    for dir_name, file_name in (("Show .", "a.srt"), ("Show ", "b.srt")):
+        tmp_path.joinpath(dir_name).mkdir()
+        tmp_path.joinpath(dir_name, file_name).write_text(file_name)
+    rename_badly_named_directories(KitsuConfig(destination=tmp_path))
+    assert sorted(str(p.relative_to(tmp_path)) for p in tmp_path.rglob("*")) == ["Show", "Show/a.srt", "Show/b.srt"]
+
+
+def test_delete_dir_emptied_in_trash(tmp_path: pathlib.Path) -> None:
+    # The directory only holds a file in its trash folder, which is removed after the previous run.
+    tmp_path.joinpath("Show", TRASH_DIR_NAME).mkdir(parents=True)
+    trashed_file = tmp_path.joinpath("Show", TRASH_DIR_NAME, "a.srt")
+    trashed_file.write_text("a")
+    past_ns = time.time_ns() - 60_000_000_000
+    os.utime(tmp_path / "Show", ns=(past_ns, past_ns))
+    delete_empty_directories(KitsuConfig(destination=tmp_path), modified_since_ns=past_ns + 1)
+    assert tmp_path.joinpath("Show").is_dir(), "the directory still has a file"
+    trashed_file.unlink()
+    delete_empty_directories(KitsuConfig(destination=tmp_path), modified_since_ns=past_ns + 1)
+    assert not tmp_path.joinpath("Show").exists(), "the directory is empty now"